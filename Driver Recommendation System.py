@@ -1,300 +1,658 @@
-import pandas as pd
-import gspread
-from google.oauth2.service_account import Credentials
-from collections import defaultdict, Counter
-import re
-
-class DriverRecommendationSystem:
-    def __init__(self, credentials_path=None):
-        """
-        Initialize Driver Recommendation System
-        
-        Args:
-            credentials_path: Path to Google Service Account JSON file
-        """
-        self.credentials_path = credentials_path
-        self.raw_data = None
-        self.experience_matrix = defaultdict(lambda: defaultdict(int))
-        self.province_experience = defaultdict(lambda: defaultdict(int))
-        self.hospital_types = defaultdict(set)
-        self.drivers_stats = defaultdict(dict)
-        
-    def load_data_from_sheets(self, spreadsheet_url, sheet_name="datatrip"):
-        """
-        Load data from Google Sheets
-        
-        Args:
-            spreadsheet_url: URL of Google Sheets
-            sheet_name: Name of the sheet to read
-        """
-        try:
-            # Extract spreadsheet ID from URL
-            sheet_id = re.search(r'/spreadsheets/d/([a-zA-Z0-9-_]+)', spreadsheet_url).group(1)
-            
-            if self.credentials_path:
-                # Use service account credentials
-                scope = ['https://spreadsheets.google.com/feeds',
-                        'https://www.googleapis.com/auth/drive']
-                creds = Credentials.from_service_account_file(self.credentials_path, scopes=scope)
-                client = gspread.authorize(creds)
-                sheet = client.open_by_key(sheet_id).worksheet(sheet_name)
-                data = sheet.get_all_records()
-                self.raw_data = pd.DataFrame(data)
-            else:
-                # Use public access (if available)
-                csv_url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/export?format=csv&gid=0"
-                self.raw_data = pd.read_csv(csv_url)
-                
-            print(f"✅ โหลดข้อมูลสำเร็จ: {len(self.raw_data)} รายการ")
-            return True
-            
-        except Exception as e:
-            print(f"❌ เกิดข้อผิดพลาดในการโหลดข้อมูล: {e}")
-            return False
-    
-    def load_sample_data(self):
-        """Load sample data for testing without Google Sheets access"""
-        sample_data = [
-            {"สถานที่ส่ง": "โรงพยาบาลระยอง", "จังหวัด": "ระยอง", "Driver": "อนุชา", "ผู้แทน": "พงศกร"},
-            {"สถานที่ส่ง": "โรงพยาบาลระยอง", "จังหวัด": "ระยอง", "Driver": "อนุชา", "ผู้แทน": "พงศกร"},
-            {"สถานที่ส่ง": "โรงพยาบาลสมเด็จพระบรมราชเทวี ณ ศรีราชา", "จังหวัด": "ชลบุรี", "Driver": "อนุชา", "ผู้แทน": "พงศกร"},
-            {"สถานที่ส่ง": "โรงพยาบาลแม่สาย", "จังหวัด": "เชียงราย", "Driver": "ไพบูรณ์", "ผู้แทน": "เพิ่มศักดิ์"},
-            {"สถานที่ส่ง": "โรงพยาบาลแม่สาย", "จังหวัด": "เชียงราย", "Driver": "ไพบูรณ์", "ผู้แทน": "เพิ่มศักดิ์"},
-            {"สถานที่ส่ง": "โรงพยาบาลศรีสะเกษ", "จังหวัด": "ศรีสะเกษ", "Driver": "ไพบูรณ์+อนุวัตน์+อาลี", "ผู้แทน": "ปรีชา"},
-            {"สถานที่ส่ง": "โรงพยาบาลศิริราช", "จังหวัด": "กรุงเทพมหานคร", "Driver": "สมเกียรติ", "ผู้แทน": "เจนจิรา"},
-            {"สถานที่ส่ง": "โรงพยาบาลศิริราช", "จังหวัด": "กรุงเทพมหานคร", "Driver": "ศักดิ์สิทธิ์", "ผู้แทน": "เจนจิรา"},
-            {"สถานที่ส่ง": "โรงพยาบาลกรุงเทพคริสเตียน", "จังหวัด": "กรุงเทพมหานคร", "Driver": "สยุมภู", "ผู้แทน": "ภัทรอร"},
-            {"สถานที่ส่ง": "โรงพยาบาลกรุงเทพคริสเตียน", "จังหวัด": "กรุงเทพมหานคร", "Driver": "อนุสิทธิ์+ศักดิ์สิทธิ์+มังกร", "ผู้แทน": "ภัทรอร"},
-        ]
-        self.raw_data = pd.DataFrame(sample_data)
-        print(f"✅ โหลดข้อมูลตัวอย่าง: {len(self.raw_data)} รายการ")
-        
-    def build_experience_matrix(self):
-        """Build experience matrix for drivers"""
-        if self.raw_data is None:
-            print("❌ ไม่มีข้อมูล กรุณาโหลดข้อมูลก่อน")
-            return
-            
-        # Clean data
-        df = self.raw_data.copy()
-        df = df.dropna(subset=['สถานที่ส่ง', 'Driver'])
-        df = df[df['Driver'] != 'ยกเลิก']  # Remove cancelled entries
-        
-        for _, row in df.iterrows():
-            location = row['สถานที่ส่ง']
-            province = row['จังหวัด']
-            drivers = str(row['Driver']).split('+')  # Handle multiple drivers
-            
-            for driver in drivers:
-                driver = driver.strip()
-                if driver and driver != 'nan':
-                    # Count exact location experience
-                    self.experience_matrix[driver][location] += 1
-                    
-                    # Count province experience
-                    if pd.notna(province):
-                        self.province_experience[driver][province] += 1
-                    
-                    # Categorize hospital types
-                    self.hospital_types[driver].add(self._categorize_hospital(location))
-        
-        # Calculate driver statistics
-        self._calculate_driver_stats()
-        print("✅ สร้างเมทริกซ์ประสบการณ์เสร็จสิ้น")
-        
-    def _categorize_hospital(self, location):
-        """Categorize hospital type based on name"""
-        location = str(location).lower()
-        if 'กรุงเทพ' in location or 'bangkok' in location:
-            return 'เอกชน-ใหญ่'
-        elif 'รามาธิบดี' in location or 'ศิริราช' in location or 'จุฬาลงกรณ์' in location:
-            return 'รัฐ-มหาวิทยาลัย'
-        elif 'โรงพยาบาล' in location:
-            return 'รัฐ-ทั่วไป'
-        else:
-            return 'อื่นๆ'
-            
-    def _calculate_driver_stats(self):
-        """Calculate statistics for each driver"""
-        for driver in self.experience_matrix.keys():
-            total_trips = sum(self.experience_matrix[driver].values())
-            unique_locations = len(self.experience_matrix[driver])
-            provinces = len(self.province_experience[driver])
-            
-            self.drivers_stats[driver] = {
-                'total_trips': total_trips,
-                'unique_locations': unique_locations,
-                'provinces_covered': provinces,
-                'avg_trips_per_location': total_trips / unique_locations if unique_locations > 0 else 0,
-                'hospital_types': list(self.hospital_types[driver])
-            }
-    
-    def calculate_compatibility_score(self, destination, destination_province=None):
-        """
-        Calculate compatibility score for each driver
-        
-        Args:
-            destination: Target destination
-            destination_province: Province of destination
-            
-        Returns:
-            dict: Driver scores with explanations
-        """
-        scores = {}
-        
-        for driver in self.experience_matrix.keys():
-            score = 0
-            explanations = []
-            
-            # 1. Direct experience (40 points)
-            direct_exp = self.experience_matrix[driver].get(destination, 0)
-            if direct_exp > 0:
-                score += min(direct_exp * 10, 40)  # Max 40 points
-                explanations.append(f"เคยไป {destination} จำนวน {direct_exp} ครั้ง")
-            
-            # 2. Province experience (30 points)
-            if destination_province:
-                province_exp = self.province_experience[driver].get(destination_province, 0)
-                if province_exp > 0:
-                    score += min(province_exp * 3, 30)  # Max 30 points
-                    explanations.append(f"มีประสบการณ์ในจังหวัด {destination_province} จำนวน {province_exp} ครั้ง")
-            
-            # 3. Similar locations (20 points)
-            similar_locations = self._find_similar_locations(destination, driver)
-            if similar_locations:
-                score += min(len(similar_locations) * 5, 20)  # Max 20 points
-                explanations.append(f"เคยไปสถานที่คล้ายกัน: {', '.join(similar_locations[:3])}")
-            
-            # 4. Overall experience (10 points)
-            total_exp = self.drivers_stats[driver]['total_trips']
-            if total_exp > 0:
-                score += min(total_exp * 0.5, 10)  # Max 10 points
-                explanations.append(f"ประสบการณ์รวม {total_exp} เที่ยว")
-            
-            scores[driver] = {
-                'score': round(score, 2),
-                'explanations': explanations,
-                'stats': self.drivers_stats[driver]
-            }
-        
-        return scores
-    
-    def _find_similar_locations(self, destination, driver):
-        """Find similar locations that driver has been to"""
-        similar = []
-        destination_words = set(destination.lower().split())
-        
-        for location in self.experience_matrix[driver].keys():
-            location_words = set(location.lower().split())
-            # Find common words (excluding common words)
-            common_words = destination_words.intersection(location_words)
-            common_words.discard('โรงพยาบาล')
-            common_words.discard('ที่')
-            
-            if len(common_words) > 0:
-                similar.append(location)
-                
-        return similar[:5]  # Return top 5 similar locations
-    
-    def get_top_10_drivers(self, destination, destination_province=None, waypoints=None):
-        """
-        Get top 10 recommended drivers for destination
-        
-        Args:
-            destination: Target destination
-            destination_province: Province of destination
-            waypoints: List of waypoints (for future use)
-            
-        Returns:
-            list: Top 10 drivers with scores and explanations
-        """
-        if not self.experience_matrix:
-            print("❌ ยังไม่ได้สร้างเมทริกซ์ประสบการณ์ กรุณาเรียก build_experience_matrix() ก่อน")
-            return []
-        
-        scores = self.calculate_compatibility_score(destination, destination_province)
-        
-        # Sort by score
-        sorted_drivers = sorted(scores.items(), key=lambda x: x[1]['score'], reverse=True)
-        
-        # Return top 10
-        top_10 = []
-        for i, (driver, data) in enumerate(sorted_drivers[:10], 1):
-            top_10.append({
-                'rank': i,
-                'driver': driver,
-                'score': data['score'],
-                'explanations': data['explanations'],
-                'stats': data['stats']
-            })
-        
-        return top_10
-    
-    def print_recommendations(self, destination, destination_province=None):
-        """Print formatted recommendations"""
-        print(f"\n🎯 แนะนำพนักงานขับรถสำหรับ: {destination}")
-        if destination_province:
-            print(f"📍 จังหวัด: {destination_province}")
-        print("=" * 80)
-        
-        recommendations = self.get_top_10_drivers(destination, destination_province)
-        
-        if not recommendations:
-            print("❌ ไม่พบข้อมูลแนะนำ")
-            return
-        
-        for rec in recommendations:
-            print(f"\n🏆 อันดับ {rec['rank']}: {rec['driver']}")
-            print(f"📊 คะแนน: {rec['score']}/100")
-            print("💡 เหตุผล:")
-            for explanation in rec['explanations']:
-                print(f"   • {explanation}")
-            
-            stats = rec['stats']
-            print(f"📈 สถิติ: {stats['total_trips']} เที่ยว | "
-                  f"{stats['unique_locations']} สถานที่ | "
-                  f"{stats['provinces_covered']} จังหวัด")
-        
-        print("\n" + "=" * 80)
-    
-    def get_driver_summary(self):
-        """Get summary of all drivers"""
-        if not self.drivers_stats:
-            return "ไม่มีข้อมูลสถิติ"
-        
-        summary = []
-        for driver, stats in self.drivers_stats.items():
-            summary.append({
-                'driver': driver,
-                'total_trips': stats['total_trips'],
-                'unique_locations': stats['unique_locations'],
-                'provinces': stats['provinces_covered']
-            })
-        
-        # Sort by total trips
-        summary.sort(key=lambda x: x['total_trips'], reverse=True)
-        return summary
-
-# Example usage
-if __name__ == "__main__":
-    # Initialize system
-    system = DriverRecommendationSystem()
-    
-    # Option 1: Load from Google Sheets (requires credentials)
-    # system.load_data_from_sheets("YOUR_GOOGLE_SHEETS_URL")
-    
-    # Option 2: Load sample data for testing
-    system.load_sample_data()
-    
-    # Build experience matrix
-    system.build_experience_matrix()
-    
-    # Get recommendations
-    system.print_recommendations("โรงพยาบาลมหาราชนครเชียงใหม่", "เชียงใหม่")
-    
-    # Print driver summary
-    print("\n📋 สรุปข้อมูลพนักงานขับรถ:")
-    summary = system.get_driver_summary()
-    for i, driver_info in enumerate(summary[:5], 1):
-        print(f"{i}. {driver_info['driver']}: {driver_info['total_trips']} เที่ยว, "
+import pandas as pd
+import numpy as np
+import gspread
+from google.oauth2.service_account import Credentials
+from collections import defaultdict, Counter, OrderedDict
+import re
+import functools
+import hashlib
+import os
+from database_manager import normalize_trips
+from recommendation_engine import STOP_WORDS
+
+# Precompiled patterns for URL parsing and hospital categorization
+_SHEET_ID_RE = re.compile(r'/spreadsheets/d/([a-zA-Z0-9-_]+)')
+_HOSP_PRIVATE = re.compile(r'กรุงเทพ|bangkok', re.IGNORECASE)
+_HOSP_UNIV = re.compile(r'รามาธิบดี|ศิริราช|จุฬาลงกรณ์')
+_HOSP_GENERAL = re.compile(r'โรงพยาบาล')
+
+# Max entries kept in each memo cache before the least recently used is dropped
+_CACHE_SIZE = 10_000
+
+# Part of the disk cache key; bump when normalize_trips or the counting changes
+# so counts cached by older code are not reused
+_CACHE_FORMAT = 2
+
+# Number of set bits in each byte value, for counting bits in packed bitmaps
+_POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+class DriverRecommendationSystem:
+    def __init__(self, credentials_path=None, cache_dir=None):
+        """
+        Initialize Driver Recommendation System
+        
+        Args:
+            credentials_path: Path to Google Service Account JSON file
+            cache_dir: Directory for cached experience counts (None, the default, disables it)
+        """
+        self.credentials_path = credentials_path
+        self.cache_dir = cache_dir
+        self.raw_data = None
+        self.experience_matrix = defaultdict(lambda: defaultdict(int))
+        self.province_experience = defaultdict(lambda: defaultdict(int))
+        self.hospital_types = defaultdict(set)
+        self.drivers_stats = defaultdict(dict)
+        self._driver_loc_tokens = {}
+        self.loc_tokens = []
+        self._location_codes = {}
+        self._token_to_locations = {}
+        self._loc_bitmap = np.zeros((0, 0), dtype=np.uint8)
+        self._drivers = pd.Index([])
+        self._province_codes = {}
+        self._loc_indptr = np.zeros(1, dtype=np.intp)
+        self._loc_rows = np.zeros(0, dtype=np.intp)
+        self._loc_counts = np.zeros(0, dtype=np.int16)
+        self.prov_exp = np.zeros((0, 0), dtype=np.int16)
+        self.total_trips_vec = np.zeros(0, dtype=np.int64)
+        self._overall_points = []
+        self._overall_vec = np.zeros(0)
+        self._cache_version = 0
+        self._score_cache = OrderedDict()
+        self._similar_cache = OrderedDict()
+        
+    @staticmethod
+    @functools.lru_cache(maxsize=1)
+    def _get_client(credentials_path):
+        """Authorize gspread once per credentials file"""
+        scope = ['https://spreadsheets.google.com/feeds',
+                'https://www.googleapis.com/auth/drive']
+        creds = Credentials.from_service_account_file(credentials_path, scopes=scope)
+        return gspread.authorize(creds)
+    
+    def load_data_from_sheets(self, spreadsheet_url, sheet_name="datatrip"):
+        """
+        Load data from Google Sheets
+        
+        Args:
+            spreadsheet_url: URL of Google Sheets
+            sheet_name: Name of the sheet to read
+        """
+        try:
+            # Extract spreadsheet ID from URL
+            sheet_id = _SHEET_ID_RE.search(spreadsheet_url).group(1)
+            
+            if self.credentials_path:
+                # Use service account credentials
+                client = self._get_client(self.credentials_path)
+                sheet = client.open_by_key(sheet_id).worksheet(sheet_name)
+                data = sheet.get_all_records()
+                self.raw_data = pd.DataFrame(data)
+            else:
+                # Use public access (if available)
+                csv_url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/export?format=csv&gid=0"
+                self.raw_data = pd.read_csv(csv_url)
+                
+            print(f"✅ โหลดข้อมูลสำเร็จ: {len(self.raw_data)} รายการ")
+            return True
+            
+        except Exception as e:
+            print(f"❌ เกิดข้อผิดพลาดในการโหลดข้อมูล: {e}")
+            return False
+    
+    def load_sample_data(self):
+        """Load sample data for testing without Google Sheets access"""
+        sample_data = [
+            {"สถานที่ส่ง": "โรงพยาบาลระยอง", "จังหวัด": "ระยอง", "Driver": "อนุชา", "ผู้แทน": "พงศกร"},
+            {"สถานที่ส่ง": "โรงพยาบาลระยอง", "จังหวัด": "ระยอง", "Driver": "อนุชา", "ผู้แทน": "พงศกร"},
+            {"สถานที่ส่ง": "โรงพยาบาลสมเด็จพระบรมราชเทวี ณ ศรีราชา", "จังหวัด": "ชลบุรี", "Driver": "อนุชา", "ผู้แทน": "พงศกร"},
+            {"สถานที่ส่ง": "โรงพยาบาลแม่สาย", "จังหวัด": "เชียงราย", "Driver": "ไพบูรณ์", "ผู้แทน": "เพิ่มศักดิ์"},
+            {"สถานที่ส่ง": "โรงพยาบาลแม่สาย", "จังหวัด": "เชียงราย", "Driver": "ไพบูรณ์", "ผู้แทน": "เพิ่มศักดิ์"},
+            {"สถานที่ส่ง": "โรงพยาบาลศรีสะเกษ", "จังหวัด": "ศรีสะเกษ", "Driver": "ไพบูรณ์+อนุวัตน์+อาลี", "ผู้แทน": "ปรีชา"},
+            {"สถานที่ส่ง": "โรงพยาบาลศิริราช", "จังหวัด": "กรุงเทพมหานคร", "Driver": "สมเกียรติ", "ผู้แทน": "เจนจิรา"},
+            {"สถานที่ส่ง": "โรงพยาบาลศิริราช", "จังหวัด": "กรุงเทพมหานคร", "Driver": "ศักดิ์สิทธิ์", "ผู้แทน": "เจนจิรา"},
+            {"สถานที่ส่ง": "โรงพยาบาลกรุงเทพคริสเตียน", "จังหวัด": "กรุงเทพมหานคร", "Driver": "สยุมภู", "ผู้แทน": "ภัทรอร"},
+            {"สถานที่ส่ง": "โรงพยาบาลกรุงเทพคริสเตียน", "จังหวัด": "กรุงเทพมหานคร", "Driver": "อนุสิทธิ์+ศักดิ์สิทธิ์+มังกร", "ผู้แทน": "ภัทรอร"},
+        ]
+        self.raw_data = pd.DataFrame(sample_data)
+        print(f"✅ โหลดข้อมูลตัวอย่าง: {len(self.raw_data)} รายการ")
+        
+    def build_experience_matrix(self):
+        """Build experience matrix for drivers"""
+        if self.raw_data is None:
+            print("❌ ไม่มีข้อมูล กรุณาโหลดข้อมูลก่อน")
+            return
+            
+        # Rebuild from scratch so repeated builds don't double count
+        self._cache_version += 1
+        self.experience_matrix.clear()
+        self.province_experience.clear()
+        self.hospital_types.clear()
+        self.drivers_stats.clear()
+        self._driver_loc_tokens.clear()
+        self.loc_tokens.clear()
+        self._location_codes.clear()
+        self._token_to_locations.clear()
+        self._province_codes.clear()
+        
+        # Reuse the counts from an earlier run on identical data if cached on disk
+        cache_path = self._cache_path()
+        counts = self._load_cached_counts(cache_path)
+        if counts is None:
+            counts = self._count_experience()
+            self._save_cached_counts(cache_path, counts)
+        loc_counts, prov_counts, hospital_types = counts
+
+        # Fill the nested {driver: {key: trips}} views straight from the grouped counts;
+        # each (driver, key) pair occurs once, so plain assignment is enough
+        for matrix, counts in ((self.experience_matrix, loc_counts), (self.province_experience, prov_counts)):
+            pairs = zip(counts.index.get_level_values(0), counts.index.get_level_values(1), counts.tolist())
+            for driver, key, count in pairs:
+                matrix[driver][key] = count
+
+        # Categorize hospital types
+        for driver, driver_types in hospital_types.items():
+            self.hospital_types[driver].update(driver_types)
+
+        # Calculate driver statistics
+        self._calculate_driver_stats()
+        self._index_locations()
+        self._build_count_arrays(loc_counts, prov_counts)
+        print("✅ สร้างเมทริกซ์ประสบการณ์เสร็จสิ้น")
+        
+    def _count_experience(self):
+        """
+        Count raw_data trips per (driver, location) and (driver, province)
+        
+        Returns:
+            tuple: (location counts, province counts, {driver: hospital types})
+        """
+        # Clean data: one row per driver, cancelled entries removed
+        df = normalize_trips(self.raw_data)
+        
+        # Dictionary-encode the repeated names so groupby works on integer codes
+        df = df.astype({'Driver': 'category', 'สถานที่ส่ง': 'category', 'จังหวัด': 'category'})
+        
+        loc_counts = df.groupby(['Driver', 'สถานที่ส่ง'], sort=False, observed=True).size()
+        prov_counts = df.dropna(subset=['จังหวัด']).groupby(['Driver', 'จังหวัด'], sort=False, observed=True).size()
+        
+        # Categorize hospital types, once per distinct location
+        locations = df['สถานที่ส่ง'].cat
+        location_types = self._categorize_hospital_vec(pd.Series(locations.categories)).to_numpy()
+        types = pd.Series(location_types[locations.codes], index=df.index)
+        hospital_types = {
+            driver: set(driver_types)
+            for driver, driver_types in types.groupby(df['Driver'], sort=False, observed=True).unique().items()
+        }
+        
+        return loc_counts, prov_counts, hospital_types
+    
+    def _cache_path(self):
+        """Disk cache file for the current raw_data, keyed by a hash of its content"""
+        if not self.cache_dir:
+            return None
+        try:
+            row_hashes = pd.util.hash_pandas_object(self.raw_data, index=False).to_numpy()
+        except TypeError:
+            return None  # Unhashable cell values, skip the cache
+        digest = hashlib.sha1(row_hashes.tobytes())
+        digest.update(repr(list(self.raw_data.columns)).encode('utf-8'))
+        digest.update(f"format={_CACHE_FORMAT}".encode('utf-8'))
+        return os.path.join(self.cache_dir, f"exp_{digest.hexdigest()}.npz")
+    
+    def _load_cached_counts(self, cache_path):
+        """Load counts saved by _save_cached_counts, or None if missing/unreadable"""
+        if cache_path is None or not os.path.exists(cache_path):
+            return None
+        try:
+            # Plain arrays only; allow_pickle=False so a cache file can't run code
+            with np.load(cache_path, allow_pickle=False) as data:
+                loc_counts = pd.Series(data['loc_counts'], index=pd.MultiIndex.from_arrays(
+                    [data['loc_drivers'].tolist(), data['locations'].tolist()]))
+                prov_counts = pd.Series(data['prov_counts'], index=pd.MultiIndex.from_arrays(
+                    [data['prov_drivers'].tolist(), data['provinces'].tolist()]))
+                hospital_types = {}
+                for driver, hospital_type in zip(data['type_drivers'].tolist(), data['types'].tolist()):
+                    hospital_types.setdefault(driver, set()).add(hospital_type)
+        except Exception:
+            return None
+        return loc_counts, prov_counts, hospital_types
+    
+    def _save_cached_counts(self, cache_path, counts):
+        """Save counts to disk as plain arrays, removing cache files left from older data"""
+        if cache_path is None:
+            return
+        loc_counts, prov_counts, hospital_types = counts
+        names = {
+            'loc_drivers': loc_counts.index.get_level_values(0).tolist(),
+            'locations': loc_counts.index.get_level_values(1).tolist(),
+            'prov_drivers': prov_counts.index.get_level_values(0).tolist(),
+            'provinces': prov_counts.index.get_level_values(1).tolist(),
+            'type_drivers': [driver for driver, types in hospital_types.items() for _ in types],
+            'types': [hospital_type for types in hospital_types.values() for hospital_type in types],
+        }
+        # Only text round-trips through string arrays unchanged; skip the cache otherwise
+        if not all(isinstance(name, str) for values in names.values() for name in values):
+            return
+        arrays = {key: np.array(values, dtype=str) for key, values in names.items()}
+        arrays['loc_counts'] = loc_counts.to_numpy()
+        arrays['prov_counts'] = prov_counts.to_numpy()
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            for name in os.listdir(self.cache_dir):
+                if name.startswith('exp_') and name.endswith('.npz'):
+                    os.remove(os.path.join(self.cache_dir, name))
+            with open(cache_path, 'wb') as f:
+                np.savez(f, **arrays)
+        except OSError as e:
+            print(f"⚠️ บันทึกแคชไม่สำเร็จ: {e}")
+    
+    def _categorize_hospital(self, location):
+        """Categorize hospital type based on name"""
+        location = str(location)
+        if _HOSP_PRIVATE.search(location):
+            return 'เอกชน-ใหญ่'
+        elif _HOSP_UNIV.search(location):
+            return 'รัฐ-มหาวิทยาลัย'
+        elif _HOSP_GENERAL.search(location):
+            return 'รัฐ-ทั่วไป'
+        else:
+            return 'อื่นๆ'
+
+    def _categorize_hospital_vec(self, locations):
+        """Categorize a Series of locations in one pass (same rules as _categorize_hospital)"""
+        locations = locations.astype(str)
+        conditions = [
+            locations.str.contains(_HOSP_PRIVATE),
+            locations.str.contains(_HOSP_UNIV),
+            locations.str.contains(_HOSP_GENERAL),
+        ]
+        choices = ['เอกชน-ใหญ่', 'รัฐ-มหาวิทยาลัย', 'รัฐ-ทั่วไป']
+        return pd.Series(np.select(conditions, choices, default='อื่นๆ'), index=locations.index)
+            
+    def _calculate_driver_stats(self):
+        """Calculate statistics for each driver"""
+        for driver in self.experience_matrix.keys():
+            total_trips = sum(self.experience_matrix[driver].values())
+            unique_locations = len(self.experience_matrix[driver])
+            provinces = len(self.province_experience[driver])
+            
+            self.drivers_stats[driver] = {
+                'total_trips': total_trips,
+                'unique_locations': unique_locations,
+                'provinces_covered': provinces,
+                'avg_trips_per_location': total_trips / unique_locations if unique_locations > 0 else 0,
+                'hospital_types': list(self.hospital_types[driver])
+            }
+    
+    def _index_locations(self):
+        """
+        Number locations and index their words for similarity lookups
+        
+        Codes follow first appearance in experience_matrix order and are the location
+        columns of the count arrays. Each location is tokenized once, however many
+        drivers visited it; loc_tokens[code] is shared by every driver's
+        _driver_loc_tokens entry.
+        """
+        token_to_locations = defaultdict(list)
+        for driver, locations in self.experience_matrix.items():
+            driver_loc_tokens = []
+            for location in locations:
+                code = self._location_codes.get(location)
+                if code is None:
+                    code = self._location_codes[location] = len(self._location_codes)
+                    location_words = frozenset(location.lower().split()) - STOP_WORDS
+                    self.loc_tokens.append(location_words)
+                    for word in location_words:
+                        token_to_locations[word].append(code)
+                driver_loc_tokens.append((location, self.loc_tokens[code]))
+            self._driver_loc_tokens[driver] = driver_loc_tokens
+        
+        # {word: location codes}, as arrays ready to index the similarity mask
+        self._token_to_locations = {
+            word: np.array(codes, dtype=np.intp) for word, codes in token_to_locations.items()
+        }
+    
+    def _build_count_arrays(self, loc_counts, prov_counts):
+        """
+        Lay out trip counts as driver x location and driver x province matrices
+        
+        Rows follow experience_matrix order; location columns are the _location_codes
+        assigned by _index_locations, which must run first.
+        Locations are many and mostly unvisited per driver, so that matrix is stored
+        column-compressed: the drivers who went to location j are
+        _loc_rows[_loc_indptr[j]:_loc_indptr[j + 1]], with _loc_counts alongside.
+        Provinces are few, so prov_exp stays dense and column-major.
+        Counts are int16 unless one doesn't fit.
+        """
+        self._drivers = pd.Index(list(self.experience_matrix.keys()))
+        n_locations = len(self._location_codes)
+        
+        loc_rows = self._level_positions(loc_counts.index, 0, self._drivers)
+        loc_cols = self._level_positions(loc_counts.index, 1, pd.Index(list(self._location_codes)))
+        counts = loc_counts.to_numpy(dtype=self._count_dtype(loc_counts))
+        order = np.argsort(loc_cols, kind='stable')
+        self._loc_rows = loc_rows[order]
+        self._loc_counts = counts[order]
+        self._loc_indptr = np.zeros(n_locations + 1, dtype=np.intp)
+        np.cumsum(np.bincount(loc_cols, minlength=n_locations), out=self._loc_indptr[1:])
+        
+        provinces = prov_counts.index.get_level_values(1)
+        self._province_codes.update((province, code) for code, province in enumerate(provinces.unique()))
+        self.prov_exp = np.zeros((len(self._drivers), len(self._province_codes)), dtype=self._count_dtype(prov_counts), order='F')
+        rows = self._level_positions(prov_counts.index, 0, self._drivers)
+        cols = self._level_positions(prov_counts.index, 1, pd.Index(list(self._province_codes)))
+        self.prov_exp[rows, cols] = prov_counts.to_numpy()
+        
+        # Which locations each driver has visited, one bit per location column,
+        # set straight from the (row, column) pairs (bit order as np.packbits)
+        self._loc_bitmap = np.zeros((len(self._drivers), (n_locations + 7) // 8), dtype=np.uint8)
+        np.bitwise_or.at(self._loc_bitmap, (loc_rows, loc_cols >> 3), (0x80 >> (loc_cols & 7)).astype(np.uint8))
+        
+        # Overall experience points don't depend on the destination, so score them once here
+        self.total_trips_vec = np.bincount(loc_rows, weights=counts, minlength=len(self._drivers)).astype(np.int64)
+        self._overall_points = [min(total * 0.5, 10) for total in self.total_trips_vec.tolist()]  # Max 10 points
+        self._overall_vec = np.array(self._overall_points, dtype=float)
+    
+    @staticmethod
+    def _count_dtype(counts):
+        """Smallest of int16/int32 that holds every trip count"""
+        return np.int16 if counts.max() <= np.iinfo(np.int16).max else np.int32
+    
+    @staticmethod
+    def _level_positions(index, level, targets):
+        """
+        Positions in targets of each entry of one MultiIndex level
+        
+        Looks up each distinct level value once and maps the rest through the
+        level's integer codes, instead of hashing every (driver, key) entry.
+        """
+        return targets.get_indexer(index.levels[level])[index.codes[level]]
+    
+    def calculate_compatibility_score(self, destination, destination_province=None):
+        """
+        Calculate compatibility score for each driver
+        
+        Args:
+            destination: Target destination
+            destination_province: Province of destination
+            
+        Returns:
+            dict: Driver scores with explanations
+        """
+        key = (destination, destination_province, self._cache_version)
+        if key in self._score_cache:
+            self._score_cache.move_to_end(key)
+            return self._copy_scores(self._score_cache[key])
+        
+        scores = {}
+        if not self.experience_matrix:
+            return scores
+        
+        parts = self._score_vector(destination, destination_province)
+        for i, driver in enumerate(self._drivers):
+            scores[driver] = self._build_explanations(i, destination, destination_province, parts)
+        
+        return self._copy_scores(self._remember(self._score_cache, key, scores))
+    
+    @staticmethod
+    def _copy_scores(scores):
+        """Fresh per-driver dicts and explanation lists, so callers can't edit the cached ones"""
+        return {
+            driver: dict(data, explanations=list(data['explanations']))
+            for driver, data in scores.items()
+        }
+    
+    def _score_vector(self, destination, destination_province=None, top_n=None):
+        """
+        Score every driver for a destination with array arithmetic only
+        
+        Args:
+            destination: Target destination
+            destination_province: Province of destination
+            top_n: If given, only scores that can still reach the top_n are exact;
+                   the rest keep a lower bound below the top_n-th score
+            
+        Returns:
+            dict: Per-driver arrays aligned with _drivers, the total under 'score',
+                  and the destination's words under 'words'
+        """
+        no_trips = np.zeros(len(self._drivers), dtype=np.int32)
+        
+        # Points are accumulated in place through one scratch buffer, so each
+        # term costs no temporaries beyond the score itself; the int16 counts are
+        # widened to the buffer's int64 before multiplying so they can't overflow
+        points = np.empty(len(self._drivers), dtype=np.int64)
+        
+        # 4. Overall experience (10 points), precomputed per driver
+        score = self._overall_vec.copy()
+        
+        # 1. Direct experience (40 points), for all drivers at once
+        code = self._location_codes.get(destination)
+        direct_exp = no_trips
+        if code is not None:
+            start, end = self._loc_indptr[code], self._loc_indptr[code + 1]
+            direct_exp = no_trips.copy()
+            direct_exp[self._loc_rows[start:end]] = self._loc_counts[start:end]
+        score += np.minimum(np.multiply(direct_exp, 10, out=points, dtype=np.int64), 40, out=points)  # Max 40 points
+        
+        # 2. Province experience (30 points)
+        code = self._province_codes.get(destination_province) if destination_province else None
+        province_exp = self.prov_exp[:, code] if code is not None else no_trips
+        score += np.minimum(np.multiply(province_exp, 3, out=points, dtype=np.int64), 30, out=points)  # Max 30 points
+        
+        # 3. Similar locations (20 points): flag every known location sharing a word
+        # with the destination, then popcount each driver's visited bits under the mask
+        destination_words = frozenset(destination.lower().split()) - STOP_WORDS
+        similar_mask = np.zeros(len(self._location_codes), dtype=bool)
+        for word in destination_words:
+            similar_mask[self._token_to_locations.get(word, [])] = True
+        
+        similar_count = np.zeros(len(self._drivers), dtype=np.int64)
+        if similar_mask.any():
+            packed_mask = np.packbits(similar_mask)
+            if top_n is not None and top_n < len(score):
+                # Bound: drivers that stay below the top_n-th partial score even with
+                # the full 20 similar points can't be ranked, so skip their bitmap rows
+                kth_score = score[np.argpartition(-score, top_n - 1)[top_n - 1]]
+                alive = np.flatnonzero(score + 20 >= kth_score)
+                similar_count[alive] = _POPCOUNT[self._loc_bitmap[alive] & packed_mask].sum(axis=1)
+            else:
+                similar_count = _POPCOUNT[self._loc_bitmap & packed_mask].sum(axis=1, dtype=np.int64)
+        score += np.minimum(np.multiply(similar_count, 5, out=points), 20, out=points)  # Max 20 points
+        
+        return {
+            'words': destination_words,
+            'direct': direct_exp,
+            'province': province_exp,
+            'similar': similar_count,
+            'score': score,
+        }
+    
+    def _build_explanations(self, i, destination, destination_province, parts):
+        """
+        Build the score and explanations of the i-th driver from _score_vector parts
+        
+        Returns:
+            dict: {'score', 'explanations', 'stats'} for the driver
+        """
+        driver = self._drivers[i]
+        direct = int(parts['direct'][i])
+        province = int(parts['province'][i])
+        similar = int(parts['similar'][i])
+        total = int(self.total_trips_vec[i])
+        
+        # Summed as Python numbers so scores keep the same int/float form as before
+        score = min(direct * 10, 40) + min(province * 3, 30) + min(similar * 5, 20)
+        explanations = []
+        
+        if direct > 0:
+            explanations.append(f"เคยไป {destination} จำนวน {direct} ครั้ง")
+        
+        if province > 0:
+            explanations.append(f"มีประสบการณ์ในจังหวัด {destination_province} จำนวน {province} ครั้ง")
+        
+        if similar > 0:
+            similar_locations = self._find_similar_locations(parts['words'], driver)
+            explanations.append(f"เคยไปสถานที่คล้ายกัน: {', '.join(similar_locations[:3])}")
+        
+        if total > 0:
+            score += self._overall_points[i]
+            explanations.append(f"ประสบการณ์รวม {total} เที่ยว")
+        
+        return {
+            'score': round(score, 2),
+            'explanations': explanations,
+            'stats': self.drivers_stats[driver]
+        }
+    
+    def _top_indices(self, score, n):
+        """
+        Indices of the n highest scores, ties kept in driver order
+        
+        Args:
+            score: Score per driver row
+            n: Number of indices to return
+        """
+        if n <= 0:
+            return np.zeros(0, dtype=np.intp)
+        
+        if n < len(score):
+            # Rows above the n-th best score all make it; rows tied with it are
+            # taken in driver order, so only n rows are ever sorted
+            kth_score = score[np.argpartition(-score, n - 1)[n - 1]]
+            above = np.flatnonzero(score > kth_score)
+            tied = np.flatnonzero(score == kth_score)[:n - len(above)]
+            candidates = np.concatenate((above, tied))
+        else:
+            candidates = np.arange(len(score))
+        
+        order = np.lexsort((candidates, -score[candidates]))
+        return candidates[order]
+    
+    def _find_similar_locations(self, destination_words, driver):
+        """
+        Find similar locations that driver has been to
+        
+        Args:
+            destination_words: Lowercased destination words, stop words removed
+            driver: Driver name
+        """
+        key = (destination_words, driver, self._cache_version)
+        if key in self._similar_cache:
+            self._similar_cache.move_to_end(key)
+            return self._similar_cache[key]
+        
+        similar = [
+            location for location, location_words in self._driver_loc_tokens.get(driver, ())
+            if not destination_words.isdisjoint(location_words)
+        ]
+                
+        return self._remember(self._similar_cache, key, similar[:5])  # Return top 5 similar locations
+    
+    def _remember(self, cache, key, value):
+        """Store value in a bounded LRU cache and return it"""
+        cache[key] = value
+        if len(cache) > _CACHE_SIZE:
+            cache.popitem(last=False)
+        return value
+    
+    def get_top_10_drivers(self, destination, destination_province=None, waypoints=None):
+        """
+        Get top 10 recommended drivers for destination
+        
+        Args:
+            destination: Target destination
+            destination_province: Province of destination
+            waypoints: List of waypoints (for future use)
+            
+        Returns:
+            list: Top 10 drivers with scores and explanations
+        """
+        if not self.experience_matrix:
+            print("❌ ยังไม่ได้สร้างเมทริกซ์ประสบการณ์ กรุณาเรียก build_experience_matrix() ก่อน")
+            return []
+        
+        parts = self._score_vector(destination, destination_province, top_n=10)
+        
+        # Partial selection: only the best 10 are needed, and only they get explanations
+        top_10 = []
+        for rank, i in enumerate(self._top_indices(parts['score'], 10).tolist(), 1):
+            data = self._build_explanations(i, destination, destination_province, parts)
+            top_10.append({
+                'rank': rank,
+                'driver': self._drivers[i],
+                'score': data['score'],
+                'explanations': data['explanations'],
+                'stats': data['stats']
+            })
+        
+        return top_10
+    
+    def print_recommendations(self, destination, destination_province=None):
+        """Print formatted recommendations"""
+        print(f"\n🎯 แนะนำพนักงานขับรถสำหรับ: {destination}")
+        if destination_province:
+            print(f"📍 จังหวัด: {destination_province}")
+        print("=" * 80)
+        
+        recommendations = self.get_top_10_drivers(destination, destination_province)
+        
+        if not recommendations:
+            print("❌ ไม่พบข้อมูลแนะนำ")
+            return
+        
+        for rec in recommendations:
+            print(f"\n🏆 อันดับ {rec['rank']}: {rec['driver']}")
+            print(f"📊 คะแนน: {rec['score']}/100")
+            print("💡 เหตุผล:")
+            for explanation in rec['explanations']:
+                print(f"   • {explanation}")
+            
+            stats = rec['stats']
+            print(f"📈 สถิติ: {stats['total_trips']} เที่ยว | "
+                  f"{stats['unique_locations']} สถานที่ | "
+                  f"{stats['provinces_covered']} จังหวัด")
+        
+        print("\n" + "=" * 80)
+    
+    def get_driver_summary(self):
+        """Get summary of all drivers"""
+        if not self.drivers_stats:
+            return "ไม่มีข้อมูลสถิติ"
+        
+        summary = []
+        for driver, stats in self.drivers_stats.items():
+            summary.append({
+                'driver': driver,
+                'total_trips': stats['total_trips'],
+                'unique_locations': stats['unique_locations'],
+                'provinces': stats['provinces_covered']
+            })
+        
+        # Sort by total trips
+        summary.sort(key=lambda x: x['total_trips'], reverse=True)
+        return summary
+
+# Example usage
+if __name__ == "__main__":
+    # Initialize system
+    system = DriverRecommendationSystem()
+    
+    # Option 1: Load from Google Sheets (requires credentials)
+    # system.load_data_from_sheets("YOUR_GOOGLE_SHEETS_URL")
+    
+    # Option 2: Load sample data for testing
+    system.load_sample_data()
+    
+    # Build experience matrix
+    system.build_experience_matrix()
+    
+    # Get recommendations
+    system.print_recommendations("โรงพยาบาลมหาราชนครเชียงใหม่", "เชียงใหม่")
+    
+    # Print driver summary
+    print("\n📋 สรุปข้อมูลพนักงานขับรถ:")
+    summary = system.get_driver_summary()
+    for i, driver_info in enumerate(summary[:5], 1):
+        print(f"{i}. {driver_info['driver']}: {driver_info['total_trips']} เที่ยว, "
               f"{driver_info['unique_locations']} สถานที่, {driver_info['provinces']} จังหวัด")
\ No newline at end of file
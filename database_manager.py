@@ -1,220 +1,343 @@
-import sqlite3
-import pandas as pd
-import gspread
-from google.oauth2.service_account import Credentials
-import re
-import os
-
-class DatabaseManager:
-    def __init__(self, db_path="driver_data.db"):
-        """
-        Database Manager for Driver Recommendation System
-        
-        Args:
-            db_path: Path to SQLite database file
-        """
-        self.db_path = db_path
-        self.init_database()
-    
-    def init_database(self):
-        """Initialize database tables"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Create trips table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS trips (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                location TEXT NOT NULL,
-                province TEXT,
-                driver TEXT NOT NULL,
-                representative TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # Create drivers table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS drivers (
-                driver_name TEXT PRIMARY KEY,
-                total_trips INTEGER DEFAULT 0,
-                unique_locations INTEGER DEFAULT 0,
-                provinces_covered INTEGER DEFAULT 0,
-                last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        conn.commit()
-        conn.close()
-        print(f"✅ Database initialized: {self.db_path}")
-    
-    def load_from_google_sheets(self, spreadsheet_url, credentials_path=None, sheet_name="datatrip"):
-        """Load data from Google Sheets and save to database"""
-        try:
-            # Extract spreadsheet ID and gid
-            sheet_id = re.search(r'/spreadsheets/d/([a-zA-Z0-9-_]+)', spreadsheet_url).group(1)
-            
-            # Extract gid if present in URL
-            gid_match = re.search(r'[#&]gid=([0-9]+)', spreadsheet_url)
-            gid = gid_match.group(1) if gid_match else "0"
-            
-            print(f"🔍 Trying to access sheet: {sheet_id}, gid: {gid}")
-            
-            if credentials_path and os.path.exists(credentials_path):
-                # Use service account
-                scope = ['https://spreadsheets.google.com/feeds',
-                        'https://www.googleapis.com/auth/drive']
-                creds = Credentials.from_service_account_file(credentials_path, scopes=scope)
-                client = gspread.authorize(creds)
-                sheet = client.open_by_key(sheet_id).worksheet(sheet_name)
-                data = sheet.get_all_records()
-                df = pd.DataFrame(data)
-            else:
-                # Try public access with multiple methods
-                success = False
-                
-                # Method 1: Try with extracted gid
-                try:
-                    csv_url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/export?format=csv&gid={gid}"
-                    print(f"🔗 Trying URL: {csv_url}")
-                    df = pd.read_csv(csv_url, encoding='utf-8')
-                    print(f"✅ Successfully loaded with gid {gid}")
-                    success = True
-                except Exception as e1:
-                    print(f"⚠️ Failed with gid {gid}: {e1}")
-                    
-                    # Method 2: Try with gid=0
-                    try:
-                        csv_url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/export?format=csv&gid=0"
-                        print(f"🔗 Trying URL: {csv_url}")
-                        df = pd.read_csv(csv_url, encoding='utf-8')
-                        print("✅ Successfully loaded with gid 0")
-                        success = True
-                    except Exception as e2:
-                        print(f"⚠️ Failed with gid 0: {e2}")
-                        
-                        # Method 3: Try different encoding
-                        try:
-                            df = pd.read_csv(csv_url, encoding='latin1')
-                            print("✅ Successfully loaded with latin1 encoding")
-                            success = True
-                        except Exception as e3:
-                            print(f"⚠️ Failed with latin1: {e3}")
-                
-                if not success:
-                    print("❌ All methods failed, cannot proceed without real data")
-                    return False
-            
-            # Validate data
-            if df.empty:
-                print("❌ Empty dataframe, cannot proceed")
-                return False
-                
-            if len(df.columns) < 3:
-                print("❌ Invalid data format (too few columns), cannot proceed")
-                return False
-            
-            # Check if we have expected columns
-            expected_cols = ['สถานที่ส่ง', 'จังหวัด', 'Driver', 'ผู้แทน']
-            if not any(col in df.columns for col in expected_cols):
-                print("❌ Expected columns not found, cannot proceed")
-                print(f"Available columns: {list(df.columns)}")
-                return False
-            
-            # Save to database
-            self.save_trips_data(df)
-            print(f"✅ Loaded {len(df)} records from Google Sheets")
-            return True
-            
-        except Exception as e:
-            print(f"❌ Error loading from Google Sheets: {e}")
-            return False
-    
-    def save_trips_data(self, df):
-        """Save trips data to database"""
-        conn = sqlite3.connect(self.db_path)
-        
-        # Clear existing data
-        conn.execute("DELETE FROM trips")
-        
-        # Insert new data
-        for _, row in df.iterrows():
-            if pd.notna(row.get('สถานที่ส่ง')) and pd.notna(row.get('Driver')):
-                drivers = str(row.get('Driver', '')).split('+')
-                for driver in drivers:
-                    driver = driver.strip()
-                    if driver and driver != 'ยกเลิก' and driver != 'nan':
-                        conn.execute('''
-                            INSERT INTO trips (location, province, driver, representative)
-                            VALUES (?, ?, ?, ?)
-                        ''', (
-                            row.get('สถานที่ส่ง', ''),
-                            row.get('จังหวัด', ''),
-                            driver,
-                            row.get('ผู้แทน', '')
-                        ))
-        
-        conn.commit()
-        conn.close()
-        self._update_driver_stats()
-        print("✅ Data saved to database")
-    
-    def _update_driver_stats(self):
-        """Update driver statistics"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Clear existing driver stats
-        cursor.execute("DELETE FROM drivers")
-        
-        # Calculate and insert new stats
-        cursor.execute('''
-            INSERT INTO drivers (driver_name, total_trips, unique_locations, provinces_covered)
-            SELECT 
-                driver,
-                COUNT(*) as total_trips,
-                COUNT(DISTINCT location) as unique_locations,
-                COUNT(DISTINCT province) as provinces_covered
-            FROM trips 
-            WHERE driver != 'ยกเลิก'
-            GROUP BY driver
-        ''')
-        
-        conn.commit()
-        conn.close()
-    
-    def get_all_trips(self):
-        """Get all trips from database"""
-        conn = sqlite3.connect(self.db_path)
-        df = pd.read_sql_query("SELECT * FROM trips", conn)
-        conn.close()
-        return df
-    
-    def get_locations_list(self):
-        """Get list of all unique locations with their provinces"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT DISTINCT location, province 
-            FROM trips 
-            WHERE location IS NOT NULL AND location != ''
-            ORDER BY location
-        ''')
-        
-        locations = cursor.fetchall()
-        conn.close()
-        
-        # Return as dict for easy lookup
-        location_dict = {}
-        for location, province in locations:
-            location_dict[location] = province if province else ""
-        
-        return location_dict
-
-    def get_driver_stats(self):
-        """Get driver statistics"""
-        conn = sqlite3.connect(self.db_path)
-        df = pd.read_sql_query("SELECT * FROM drivers ORDER BY total_trips DESC", conn)
-        conn.close()
-        return df
\ No newline at end of file
+import sqlite3
+import pandas as pd
+import gspread
+from google.oauth2.service_account import Credentials
+import re
+import os
+import functools
+import threading
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+
+# Precompiled patterns for Google Sheets URLs
+_SHEET_ID_RE = re.compile(r'/spreadsheets/d/([a-zA-Z0-9-_]+)')
+_GID_RE = re.compile(r'[#&]gid=([0-9]+)')
+
+# Rows per chunk when streaming the public CSV export into the database
+_CSV_CHUNK_SIZE = 5000
+
+def normalize_trips(df):
+    """
+    Clean raw trip rows into one row per driver
+    
+    Drops rows without a location or driver, splits drivers joined with '+'
+    and removes blank/cancelled driver names.
+    
+    Args:
+        df: DataFrame with the sheet columns (สถานที่ส่ง, จังหวัด, Driver, ผู้แทน)
+        
+    Returns:
+        DataFrame: Same columns, Driver holding a single name per row
+    """
+    df = df.reindex(columns=df.columns.union(['สถานที่ส่ง', 'Driver'], sort=False))
+    df = df.dropna(subset=['สถานที่ส่ง', 'Driver'])
+    df = df.assign(Driver=df['Driver'].astype(str).str.split('+')).explode('Driver', ignore_index=True)
+    df['Driver'] = df['Driver'].str.strip()
+    return df[~df['Driver'].isin(('', 'nan', 'ยกเลิก'))]
+
+def _sql_values(df, column, default=None):
+    """
+    One column as a list of plain Python values for sqlite3
+    
+    Missing values become None (stored as NULL); a missing column gives default for every row.
+    """
+    if column not in df:
+        return [default] * len(df)
+    values = df[column].astype(object)
+    return values.where(values.notna(), None).tolist()
+
+class DatabaseManager:
+    def __init__(self, db_path="driver_data.db"):
+        """
+        Database Manager for Driver Recommendation System
+        
+        Args:
+            db_path: Path to SQLite database file
+        """
+        self.db_path = db_path
+        
+        # One long-lived connection per thread keeps the schema parsed and the page
+        # cache warm, while a load running in a worker thread keeps its open
+        # transaction to itself instead of exposing it to the UI thread's reads
+        self._connections = {}
+        self._connections_lock = threading.Lock()
+        
+        self.init_database()
+    
+    @property
+    def _conn(self):
+        """The calling thread's connection, opened on first use"""
+        thread = threading.current_thread()
+        conn = self._connections.get(thread)
+        if conn is None:
+            with self._connections_lock:
+                # Drop connections left behind by finished threads (e.g. earlier loads)
+                for finished in [t for t in self._connections if not t.is_alive()]:
+                    self._connections.pop(finished).close()
+                conn = self._connections[thread] = self._connect()
+        return conn
+    
+    def _connect(self):
+        """Open a tuned connection to the database"""
+        # check_same_thread=False only so close() can run from another thread
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA cache_size=-20000")
+        return conn
+    
+    def close(self):
+        """Close every thread's database connection"""
+        with self._connections_lock:
+            for conn in self._connections.values():
+                conn.close()
+            self._connections.clear()
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=1)
+    def _get_client(credentials_path):
+        """Authorize gspread once per credentials file"""
+        scope = ['https://spreadsheets.google.com/feeds',
+                'https://www.googleapis.com/auth/drive']
+        creds = Credentials.from_service_account_file(credentials_path, scopes=scope)
+        return gspread.authorize(creds)
+    
+    def init_database(self):
+        """Initialize database tables"""
+        cursor = self._conn.cursor()
+        
+        # Create trips table
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS trips (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                location TEXT NOT NULL,
+                province TEXT,
+                driver TEXT NOT NULL,
+                representative TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        
+        # Create drivers table
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS drivers (
+                driver_name TEXT PRIMARY KEY,
+                total_trips INTEGER DEFAULT 0,
+                unique_locations INTEGER DEFAULT 0,
+                provinces_covered INTEGER DEFAULT 0,
+                last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        
+        # Covering indexes for per-driver aggregation and location lookups
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_trips_driver ON trips(driver, location, province)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_trips_location ON trips(location, province)")
+        
+        # WAL is persistent on the database file; readers no longer block bulk loads
+        cursor.execute("PRAGMA journal_mode=WAL")
+        
+        self._conn.commit()
+        print(f"✅ Database initialized: {self.db_path}")
+    
+    def load_from_google_sheets(self, spreadsheet_url, credentials_path=None, sheet_name="datatrip"):
+        """Load data from Google Sheets and save to database"""
+        try:
+            # Extract spreadsheet ID and gid
+            sheet_id = _SHEET_ID_RE.search(spreadsheet_url).group(1)
+            
+            # Extract gid if present in URL
+            gid_match = _GID_RE.search(spreadsheet_url)
+            gid = gid_match.group(1) if gid_match else "0"
+            
+            print(f"🔍 Trying to access sheet: {sheet_id}, gid: {gid}")
+            
+            if credentials_path and os.path.exists(credentials_path):
+                # Use service account
+                client = self._get_client(credentials_path)
+                sheet = client.open_by_key(sheet_id).worksheet(sheet_name)
+                data = sheet.get_all_records()
+                df = pd.DataFrame(data)
+                chunks = [df]
+            else:
+                # Try public access with multiple methods
+                opened = self._read_public_csv(sheet_id, gid)
+                
+                if opened is None:
+                    print("❌ All methods failed, cannot proceed without real data")
+                    return False
+                
+                # Validate on the first chunk, then stream the rest straight into the database
+                df, reader = opened
+                chunks = itertools.chain([df], reader)
+            
+            # Validate data
+            if df.empty:
+                print("❌ Empty dataframe, cannot proceed")
+                return False
+                
+            if len(df.columns) < 3:
+                print("❌ Invalid data format (too few columns), cannot proceed")
+                return False
+            
+            # Check if we have expected columns
+            expected_cols = ['สถานที่ส่ง', 'จังหวัด', 'Driver', 'ผู้แทน']
+            if not any(col in df.columns for col in expected_cols):
+                print("❌ Expected columns not found, cannot proceed")
+                print(f"Available columns: {list(df.columns)}")
+                return False
+            
+            # Save to database
+            records = self.save_trips_chunks(chunks)
+            print(f"✅ Loaded {records} records from Google Sheets")
+            return True
+            
+        except Exception as e:
+            print(f"❌ Error loading from Google Sheets: {e}")
+            return False
+    
+    @staticmethod
+    def _open_csv(csv_url, encoding):
+        """Start a chunked CSV read, returning (first chunk, reader for the rest)"""
+        reader = pd.read_csv(csv_url, encoding=encoding, chunksize=_CSV_CHUNK_SIZE)
+        return next(reader), reader
+    
+    @staticmethod
+    def _close_reader(future):
+        """Close the CSV reader of a finished _open_csv future whose result goes unused"""
+        if not future.cancelled() and future.exception() is None:
+            future.result()[1].close()
+    
+    def _read_public_csv(self, sheet_id, gid):
+        """
+        Open the public CSV export, trying all URL/encoding variants concurrently
+        
+        Returns:
+            tuple: (first chunk, reader for the remaining chunks), or None if all failed
+        """
+        # In order of preference: extracted gid, gid=0, gid=0 with latin1;
+        # when the extracted gid is already 0 its duplicate is dropped
+        candidates = list(dict.fromkeys([(gid, 'utf-8'), ('0', 'utf-8'), ('0', 'latin1')]))
+        
+        executor = ThreadPoolExecutor(max_workers=len(candidates))
+        futures = []
+        for candidate_gid, encoding in candidates:
+            csv_url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/export?format=csv&gid={candidate_gid}"
+            print(f"🔗 Trying URL: {csv_url} ({encoding})")
+            futures.append(executor.submit(self._open_csv, csv_url, encoding))
+        
+        # Keep the preferred variant that succeeds; the others ran in parallel
+        opened = None
+        for i, ((candidate_gid, encoding), future) in enumerate(zip(candidates, futures)):
+            try:
+                opened = future.result()
+            except Exception as e:
+                print(f"⚠️ Failed with gid {candidate_gid} ({encoding}): {e}")
+                continue
+            print(f"✅ Successfully loaded with gid {candidate_gid} ({encoding})")
+            # Less preferred variants may still succeed; close their downloads when they do
+            for unused in futures[i + 1:]:
+                unused.add_done_callback(self._close_reader)
+            break
+        
+        executor.shutdown(wait=False, cancel_futures=True)
+        return opened
+    
+    def save_trips_data(self, df):
+        """Save trips data to database"""
+        self.save_trips_chunks([df])
+    
+    def save_trips_chunks(self, chunks):
+        """
+        Replace trips data with rows from a sequence of sheet DataFrames
+        
+        Args:
+            chunks: Iterable of DataFrames with the sheet columns
+            
+        Returns:
+            int: Number of sheet rows read
+        """
+        records = 0
+        
+        # Replace existing data in a single transaction, one chunk in memory at a time
+        with self._conn:
+            self._conn.execute("DELETE FROM trips")
+            for chunk in chunks:
+                records += len(chunk)
+                df = normalize_trips(chunk)
+                
+                # Zip plain column lists instead of building and iterating a row-wise frame
+                trips = zip(
+                    _sql_values(df, 'สถานที่ส่ง'),
+                    _sql_values(df, 'จังหวัด', ''),
+                    _sql_values(df, 'Driver'),
+                    _sql_values(df, 'ผู้แทน', ''),
+                )
+                self._conn.executemany('''
+                    INSERT INTO trips (location, province, driver, representative)
+                    VALUES (?, ?, ?, ?)
+                ''', trips)
+        
+        # Refresh planner statistics so the indexes get used after a reload
+        self._conn.execute("ANALYZE trips")
+        
+        self._update_driver_stats()
+        print("✅ Data saved to database")
+        return records
+    
+    def _update_driver_stats(self):
+        """Update driver statistics"""
+        cursor = self._conn.cursor()
+        
+        # Clear existing driver stats
+        cursor.execute("DELETE FROM drivers")
+        
+        # Calculate and insert new stats
+        cursor.execute('''
+            INSERT INTO drivers (driver_name, total_trips, unique_locations, provinces_covered)
+            SELECT 
+                driver,
+                COUNT(*) as total_trips,
+                COUNT(DISTINCT location) as unique_locations,
+                COUNT(DISTINCT province) as provinces_covered
+            FROM trips 
+            WHERE driver != 'ยกเลิก'
+            GROUP BY driver
+        ''')
+        
+        self._conn.commit()
+    
+    def get_all_trips(self, chunksize=None):
+        """
+        Get all trips from database
+        
+        Args:
+            chunksize: Rows per DataFrame; if set, returns an iterator of chunks
+                so the whole table is never held in memory at once
+        """
+        return pd.read_sql_query("SELECT * FROM trips", self._conn, chunksize=chunksize)
+    
+    def count_trips(self):
+        """Get the number of trips in the database"""
+        return self._conn.execute("SELECT COUNT(*) FROM trips").fetchone()[0]
+    
+    def get_recent_trips(self, limit=5):
+        """Get the last `limit` trips, oldest first"""
+        return pd.read_sql_query('''
+            SELECT * FROM (SELECT * FROM trips ORDER BY id DESC LIMIT ?) ORDER BY id
+        ''', self._conn, params=(limit,))
+    
+    def get_locations_list(self):
+        """Get list of all unique locations with their provinces"""
+        cursor = self._conn.execute('''
+            SELECT DISTINCT location, COALESCE(province, '')
+            FROM trips 
+            WHERE location IS NOT NULL AND location != ''
+            ORDER BY location
+        ''')
+        
+        # Return as dict for easy lookup
+        return dict(cursor)
+
+    def get_driver_stats(self):
+        """Get driver statistics"""
+        return pd.read_sql_query("SELECT * FROM drivers ORDER BY total_trips DESC", self._conn)
\ No newline at end of file
@@ -1,157 +1,362 @@
-import sqlite3
-from collections import defaultdict
-import pandas as pd
-
-class RecommendationEngine:
-    def __init__(self, db_path="driver_data.db"):
-        """
-        Recommendation Engine for Driver Selection
-        
-        Args:
-            db_path: Path to SQLite database
-        """
-        self.db_path = db_path
-        self.experience_matrix = defaultdict(lambda: defaultdict(int))
-        self.province_experience = defaultdict(lambda: defaultdict(int))
-        self.drivers_stats = {}
-        self.load_data()
-    
-    def load_data(self):
-        """Load data from database and build matrices"""
-        conn = sqlite3.connect(self.db_path)
-        
-        # Load trips
-        trips_df = pd.read_sql_query("SELECT * FROM trips", conn)
-        
-        # Load driver stats
-        stats_df = pd.read_sql_query("SELECT * FROM drivers", conn)
-        
-        conn.close()
-        
-        # Build experience matrices
-        for _, row in trips_df.iterrows():
-            driver = row['driver']
-            location = row['location']
-            province = row['province']
-            
-            self.experience_matrix[driver][location] += 1
-            if pd.notna(province):
-                self.province_experience[driver][province] += 1
-        
-        # Store driver stats
-        for _, row in stats_df.iterrows():
-            self.drivers_stats[row['driver_name']] = {
-                'total_trips': row['total_trips'],
-                'unique_locations': row['unique_locations'],
-                'provinces_covered': row['provinces_covered']
-            }
-        
-        print(f"✅ Loaded data for {len(self.drivers_stats)} drivers")
-    
-    def calculate_route_score(self, destinations):
-        """
-        Calculate actual trip counts for multiple destinations (1-4 locations)
-        
-        Args:
-            destinations: List of dict [{'name': str, 'province': str}, ...]
-            
-        Returns:
-            dict: Driver trip counts with details
-        """
-        if not destinations or len(destinations) > 4:
-            raise ValueError("Destinations must be 1-4 locations")
-        
-        results = {}
-        
-        for driver in self.experience_matrix.keys():
-            route_details = []
-            total_trips = 0
-            destinations_visited = 0
-            
-            for i, dest in enumerate(destinations, 1):
-                dest_name = dest['name']
-                dest_province = dest.get('province', '')
-                
-                # Get actual trip count for this destination
-                trip_count = self.experience_matrix[driver].get(dest_name, 0)
-                
-                route_details.append({
-                    'destination': dest_name,
-                    'province': dest_province,
-                    'trip_count': trip_count,
-                    'visited': trip_count > 0
-                })
-                
-                total_trips += trip_count
-                if trip_count > 0:
-                    destinations_visited += 1
-            
-            results[driver] = {
-                'total_trips': total_trips,
-                'destinations_visited': destinations_visited,
-                'destinations_count': len(destinations),
-                'completion_ratio': destinations_visited / len(destinations),
-                'route_details': route_details,
-                'stats': self.drivers_stats.get(driver, {})
-            }
-        
-        return results
-    
-    def _find_similar_locations(self, destination, driver):
-        """Find similar locations that driver has been to"""
-        similar = []
-        destination_words = set(destination.lower().split())
-        
-        for location in self.experience_matrix[driver].keys():
-            location_words = set(location.lower().split())
-            common_words = destination_words.intersection(location_words)
-            common_words.discard('โรงพยาบาล')
-            common_words.discard('ที่')
-            
-            if len(common_words) > 0:
-                similar.append(location)
-        
-        return similar[:5]
-    
-    def get_top_drivers(self, destinations, top_n=30):
-        """
-        Get top N drivers for the route based on actual trip counts
-        
-        Args:
-            destinations: List of destinations
-            top_n: Number of top drivers to return (default 30)
-            
-        Returns:
-            list: Top drivers with rankings based on actual experience
-        """
-        results = self.calculate_route_score(destinations)
-        
-        # Sort by:
-        # 1. Number of destinations visited (descending)
-        # 2. Total trips to those destinations (descending)
-        # 3. Driver name (ascending) for ties
-        sorted_drivers = sorted(
-            results.items(), 
-            key=lambda x: (
-                x[1]['destinations_visited'],      # Primary: destinations visited
-                x[1]['total_trips'],               # Secondary: total trips
-                -ord(x[0][0])                     # Tertiary: driver name (reverse alphabetical)
-            ), 
-            reverse=True
-        )
-        
-        # Return top N
-        top_drivers = []
-        for i, (driver, data) in enumerate(sorted_drivers[:top_n], 1):
-            top_drivers.append({
-                'rank': i,
-                'driver': driver,
-                'destinations_visited': data['destinations_visited'],
-                'total_trips': data['total_trips'],
-                'destinations_count': data['destinations_count'],
-                'completion_ratio': data['completion_ratio'],
-                'route_details': data['route_details'],
-                'stats': data['stats']
-            })
-        
-        return top_drivers
\ No newline at end of file
+import sqlite3
+import threading
+from collections import OrderedDict
+import numpy as np
+
+# Rankings kept per engine for repeated route queries
+_ROUTE_CACHE_SIZE = 256
+
+# Words too common in location names to count as a similarity match
+STOP_WORDS = frozenset({'โรงพยาบาล', 'ที่'})
+
+class RecommendationEngine:
+    def __init__(self, db_path="driver_data.db"):
+        """
+        Recommendation Engine for Driver Selection
+        
+        Args:
+            db_path: Path to SQLite database
+        """
+        self.db_path = db_path
+        # Held while a reload publishes new data and while a query reads it, since
+        # the GUI reloads from a worker thread while queries may be running
+        self._lock = threading.Lock()
+        # One read-only connection reused across reloads; autocommit so no read
+        # transaction is held open between loads
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        self._ensure_indexes()
+        self._conn.execute("PRAGMA query_only=ON")
+        self._conn.execute("PRAGMA mmap_size=268435456")
+        self._conn.execute("PRAGMA cache_size=-65536")
+        # GROUP BY/ORDER BY in load_data sort through temp b-trees; keep them off disk
+        self._conn.execute("PRAGMA temp_store=MEMORY")
+        # Flat {(driver, location): trips} and {(driver, province): trips}
+        self.experience_matrix = {}
+        self.province_experience = {}
+        self.drivers = []
+        # Sparse trips per (driver row, location column), rows in self.drivers order
+        self.location_index = {}
+        # {driver: [(location, location words), ...]} for similar-location lookups,
+        # built on first use after each load
+        self._driver_locations = None
+        self.drivers_stats = {}
+        # LRU of get_top_drivers results, keyed by (destinations, top_n)
+        self._route_cache = OrderedDict()
+        # LRU of _route_counts arrays, keyed by destination names
+        self._counts_cache = OrderedDict()
+        self.load_data()
+    
+    def _ensure_indexes(self):
+        """Create the trips indexes if the database was built without them"""
+        # Same definitions as DatabaseManager.init_database, so neither side shadows the other
+        try:
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_trips_driver ON trips(driver, location, province)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_trips_location ON trips(location, province)")
+        except sqlite3.Error as e:
+            print(f"⚠️ Could not create trips indexes: {e}")
+    
+    def close(self):
+        """Close the database connection"""
+        self._conn.close()
+    
+    def load_data(self):
+        """Load data from database and build matrices"""
+        # Everything is built into locals and published together at the end, so a
+        # query running in another thread during a reload never sees half of it
+        
+        # Let SQLite count trips per (driver, location) and (driver, province) so only
+        # distinct pairs cross into Python, in order of each pair's first trip
+        province_experience = {(driver, province): count for driver, province, count in self._conn.execute('''
+            SELECT driver, province, COUNT(*) FROM trips
+            WHERE province IS NOT NULL
+            GROUP BY driver, province
+            ORDER BY MIN(id)
+        ''')}
+        
+        # Load driver stats
+        stats = self._conn.execute('''
+            SELECT driver_name, total_trips, unique_locations, provinces_covered FROM drivers
+        ''').fetchall()
+        
+        # One pass over the (driver, location) pairs fills the experience matrix and
+        # numbers drivers and locations by first appearance
+        experience_matrix = {}
+        driver_index = {}
+        location_index = {}
+        rows, cols, counts = [], [], []
+        for driver, location, count in self._conn.execute('''
+            SELECT driver, location, COUNT(*) FROM trips
+            GROUP BY driver, location
+            ORDER BY MIN(id)
+        '''):
+            experience_matrix[driver, location] = count
+            row = driver_index.get(driver)
+            if row is None:
+                row = driver_index[driver] = len(driver_index)
+            col = location_index.get(location)
+            if col is None:
+                col = location_index[location] = len(location_index)
+            rows.append(row)
+            cols.append(col)
+            counts.append(count)
+        
+        # Every driver with a trip, in order of first appearance
+        drivers = list(driver_index)
+        
+        # Column-compressed trips: the drivers who went to location j are rows
+        # trip_rows[col_indptr[j]:col_indptr[j + 1]], with trip_counts alongside
+        rows = np.array(rows, dtype=np.int32)
+        cols = np.array(cols, dtype=np.intp)
+        counts = np.array(counts, dtype=np.int32)
+        
+        order = np.argsort(cols, kind='stable')
+        trip_rows = rows[order]
+        # Per-(driver, location) counts are small; int16 unless a count doesn't fit
+        counts_dtype = np.int16 if counts.max(initial=0) <= np.iinfo(np.int16).max else np.int32
+        trip_counts = counts[order].astype(counts_dtype)
+        col_indptr = np.zeros(len(location_index) + 1, dtype=np.intp)
+        np.cumsum(np.bincount(cols, minlength=len(location_index)), out=col_indptr[1:])
+        
+        # First letter of each name, the last ranking tie-breaker
+        name_ords = np.array([ord(driver[0]) for driver in drivers], dtype=np.int64)
+        
+        # Store driver stats
+        drivers_stats = {}
+        for driver_name, total_trips, unique_locations, provinces_covered in stats:
+            drivers_stats[driver_name] = {
+                'total_trips': total_trips,
+                'unique_locations': unique_locations,
+                'provinces_covered': provinces_covered
+            }
+        
+        with self._lock:
+            self.experience_matrix = experience_matrix
+            self.province_experience = province_experience
+            self.drivers = drivers
+            self.location_index = location_index
+            self._driver_locations = None
+            self._trip_rows = trip_rows
+            self._trip_counts = trip_counts
+            self._col_indptr = col_indptr
+            self._name_ords = name_ords
+            self.drivers_stats = drivers_stats
+            # Cached rankings and counts describe the previous data
+            self._route_cache.clear()
+            self._counts_cache.clear()
+        
+        print(f"✅ Loaded data for {len(drivers_stats)} drivers")
+    
+    def calculate_route_score(self, destinations):
+        """
+        Calculate actual trip counts for multiple destinations (1-4 locations)
+        
+        Args:
+            destinations: List of dict [{'name': str, 'province': str}, ...]
+            
+        Returns:
+            dict: Driver trip counts with details
+        """
+        targets = self._route_targets(destinations)
+        with self._lock:
+            route_counts, total_trips, destinations_visited = self._route_counts(destinations)
+            
+            results = {}
+            for row, driver in enumerate(self.drivers):
+                results[driver] = self._driver_result(driver, targets, route_counts[row],
+                                                      total_trips[row], destinations_visited[row])
+        
+        return results
+    
+    def _route_counts(self, destinations):
+        """
+        Trip counts of every driver at each destination
+        
+        Args:
+            destinations: List of dict [{'name': str, 'province': str}, ...]
+            
+        Returns:
+            tuple: (drivers x destinations counts, total trips, destinations visited),
+                   rows in self.drivers order; read-only, as they are shared
+                   by every query for the same destinations
+        """
+        # Counts depend only on the destination names, so provinces and top_n
+        # can differ and still reuse them
+        cache_key = tuple(dest['name'] for dest in destinations)
+        if cache_key in self._counts_cache:
+            self._counts_cache.move_to_end(cache_key)
+            return self._counts_cache[cache_key]
+        
+        route_counts = np.zeros((len(self.drivers), len(destinations)), dtype=np.int32)
+        total_trips = np.zeros(len(self.drivers), dtype=np.int64)
+        destinations_visited = np.zeros(len(self.drivers), dtype=np.int64)
+        
+        # Only the drivers stored under each destination are touched; unknown
+        # destinations stay as zero columns. Rows are unique within a column,
+        # so the fancy-indexed += never collides.
+        for j, dest in enumerate(destinations):
+            col = self.location_index.get(dest['name'])
+            if col is not None:
+                start, end = self._col_indptr[col], self._col_indptr[col + 1]
+                rows = self._trip_rows[start:end]
+                route_counts[rows, j] = self._trip_counts[start:end]
+                total_trips[rows] += self._trip_counts[start:end]
+                destinations_visited[rows] += 1
+        
+        for array in (route_counts, total_trips, destinations_visited):
+            array.flags.writeable = False
+        
+        self._counts_cache[cache_key] = route_counts, total_trips, destinations_visited
+        if len(self._counts_cache) > _ROUTE_CACHE_SIZE:
+            self._counts_cache.popitem(last=False)
+        
+        return route_counts, total_trips, destinations_visited
+    
+    @staticmethod
+    def _route_targets(destinations):
+        """(name, province) of each destination, read once per query rather than per driver"""
+        if not destinations or len(destinations) > 4:
+            raise ValueError("Destinations must be 1-4 locations")
+        
+        return tuple((dest['name'], dest.get('province', '')) for dest in destinations)
+    
+    def _driver_result(self, driver, targets, trip_counts, total_trips, destinations_visited):
+        """Build one driver's result dict from their per-destination trip counts"""
+        route_details = []
+        for (dest_name, dest_province), trip_count in zip(targets, trip_counts.tolist()):
+            route_details.append({
+                'destination': dest_name,
+                'province': dest_province,
+                'trip_count': trip_count,
+                'visited': trip_count > 0
+            })
+        
+        destinations_visited = int(destinations_visited)
+        return {
+            'total_trips': int(total_trips),
+            'destinations_visited': destinations_visited,
+            'destinations_count': len(targets),
+            'completion_ratio': destinations_visited / len(targets),
+            'route_details': route_details,
+            'stats': self.drivers_stats.get(driver, {})
+        }
+    
+    def _rank_rows(self, total_trips, destinations_visited, top_n):
+        """
+        Pick the top_n driver rows without sorting every driver
+        
+        Args:
+            total_trips: Trips to the route's destinations per driver row
+            destinations_visited: Destinations visited per driver row
+            top_n: Number of rows to return
+            
+        Returns:
+            ndarray: Row indices in rank order
+        """
+        if top_n <= 0 or len(total_trips) == 0:
+            return np.zeros(0, dtype=np.intp)
+        
+        # Destinations visited first, then total trips, folded into one score
+        score = destinations_visited.astype(np.int64) * (int(total_trips.max()) + 1) + total_trips
+        
+        if top_n < len(score):
+            # Rows above the top_n-th score all make it; among rows tied with it,
+            # select the smallest (first letter, load order) without sorting them all
+            kth_score = score[np.argpartition(-score, top_n - 1)[top_n - 1]]
+            above = np.flatnonzero(score > kth_score)
+            tied = np.flatnonzero(score == kth_score)
+            needed = top_n - len(above)
+            if needed < len(tied):
+                tie_key = self._name_ords[tied] * len(score) + tied
+                tied = tied[np.argpartition(tie_key, needed - 1)[:needed]]
+            candidates = np.concatenate((above, tied))
+        else:
+            candidates = np.arange(len(score))
+        
+        # Score descending, then first letter ascending, then load order
+        order = np.lexsort((candidates, self._name_ords[candidates], -score[candidates]))
+        return candidates[order]
+    
+    def _find_similar_locations(self, destination, driver):
+        """Find similar locations that driver has been to"""
+        destination_words = frozenset(destination.lower().split())
+        
+        # Only this driver's locations, with their words split once per load
+        similar = [
+            location for location, location_words in self._locations_by_driver().get(driver, ())
+            if not destination_words.isdisjoint(location_words)
+        ]
+        
+        return similar[:5]
+    
+    def _locations_by_driver(self):
+        """{driver: [(location, location words), ...]}, built on first use after each load"""
+        with self._lock:
+            if self._driver_locations is None:
+                # Tokenize each location once; drivers share the word sets of the places they went
+                location_words = {}
+                driver_locations = {}
+                for driver, location in self.experience_matrix:
+                    words = location_words.get(location)
+                    if words is None:
+                        words = location_words[location] = frozenset(location.lower().split()) - STOP_WORDS
+                    driver_locations.setdefault(driver, []).append((location, words))
+                self._driver_locations = driver_locations
+            return self._driver_locations
+    
+    def get_top_drivers(self, destinations, top_n=30):
+        """
+        Get top N drivers for the route based on actual trip counts
+        
+        Args:
+            destinations: List of destinations
+            top_n: Number of top drivers to return (default 30)
+            
+        Returns:
+            list: Top drivers with rankings based on actual experience
+        """
+        # Destination order is kept in the key since route_details follow it
+        targets = self._route_targets(destinations)
+        with self._lock:
+            cache_key = (targets, top_n)
+            if cache_key in self._route_cache:
+                self._route_cache.move_to_end(cache_key)
+                return self._copy_ranking(self._route_cache[cache_key])
+            
+            route_counts, total_trips, destinations_visited = self._route_counts(destinations)
+            
+            # Sort by:
+            # 1. Number of destinations visited (descending)
+            # 2. Total trips to those destinations (descending)
+            # 3. Driver name (ascending) for ties
+            top_rows = self._rank_rows(total_trips, destinations_visited, top_n)
+            
+            # Return top N, building details only for the drivers shown
+            top_drivers = []
+            for i, row in enumerate(top_rows.tolist(), 1):
+                driver = self.drivers[row]
+                data = self._driver_result(driver, targets, route_counts[row],
+                                           total_trips[row], destinations_visited[row])
+                top_drivers.append({
+                    'rank': i,
+                    'driver': driver,
+                    'destinations_visited': data['destinations_visited'],
+                    'total_trips': data['total_trips'],
+                    'destinations_count': data['destinations_count'],
+                    'completion_ratio': data['completion_ratio'],
+                    'route_details': data['route_details'],
+                    'stats': data['stats']
+                })
+            
+            self._route_cache[cache_key] = top_drivers
+            if len(self._route_cache) > _ROUTE_CACHE_SIZE:
+                self._route_cache.popitem(last=False)
+            
+        return self._copy_ranking(top_drivers)
+    
+    @staticmethod
+    def _copy_ranking(top_drivers):
+        """Fresh ranking entries and route details, so callers can't edit the cached ones"""
+        return [
+            dict(entry, route_details=[dict(detail) for detail in entry['route_details']])
+            for entry in top_drivers
+        ]
\ No newline at end of file